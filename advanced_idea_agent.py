@@ -1,20 +1,27 @@
+import asyncio
 import os
-from typing import List, Dict, Any, Optional, Literal
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Literal, Tuple
 from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_deepseek import ChatDeepSeek
 from langchain_core.runnables import RunnablePassthrough
-from langchain.output_parsers import PydanticOutputParser
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain.tools import BaseTool, StructuredTool, tool
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_community.utilities import WikipediaAPIWrapper
+from langchain_community.vectorstores import Chroma
 from langchain_core.tools import Tool
+from langchain_core.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, START
 from typing_extensions import TypedDict
+from embedding_model import PERSIST_DIRECTORY, get_embeddings
 
 # Загрузка переменных окружения
 load_dotenv()
@@ -23,6 +30,10 @@ load_dotenv()
 if not os.getenv("DEEPSEEK_API_KEY"):
     raise ValueError("DEEPSEEK_API_KEY не найден в переменных окружения. Пожалуйста, добавьте его в .env файл.")
 
+# Кэширование ответов LLM: повторные запросы с тем же промптом не обращаются к API
+LLM_CACHE_PATH = ".llm_cache.db"
+set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
 # Модель для представления задачи
 class Task(BaseModel):
     name: str = Field(description="Название задачи")
@@ -42,7 +53,9 @@ class DecomposedIdea(BaseModel):
 class AgentState(TypedDict):
     idea: str
     decomposed_idea: Optional[DecomposedIdea]
+    prefetched_research: Dict[str, List[Any]]
     research_results: Dict[str, Any]
+    code_snippets: Dict[str, str]
     current_task: Optional[str]
     final_report: Optional[str]
 
@@ -53,38 +66,139 @@ model = ChatDeepSeek(
     max_tokens=4000
 )
 
-# Инструменты для агента
-@tool
-def search_web(query: str) -> str:
-    """Поиск информации в интернете по заданному запросу."""
-    search_tool = TavilySearchResults(max_results=3)
+# Максимальное число одновременных обращений к внешним API
+MAX_CONCURRENCY = 10
+
+# Категории задач, для которых выполняется исследование и генерация кода
+RESEARCH_CATEGORY_PATTERN = re.compile("сбор данных|поиск", re.IGNORECASE)
+CODE_CATEGORY_PATTERN = re.compile("разработка|код", re.IGNORECASE)
+
+# Цепочка для генерации кода (создается один раз и переиспользуется)
+code_prompt = ChatPromptTemplate.from_template(
+    "Напиши код для решения следующей задачи:\n\n{task_description}\n\n"
+    "Предоставь полный код с комментариями и объяснением."
+)
+code_chain = code_prompt | model | StrOutputParser()
+
+# Клиенты поиска создаются один раз и переиспользуются всеми запросами
+@lru_cache(maxsize=None)
+def get_search_tool() -> TavilySearchResults:
+    """Возвращает общий экземпляр поиска Tavily."""
+    return TavilySearchResults(max_results=3)
+
+@lru_cache(maxsize=None)
+def get_wikipedia() -> WikipediaAPIWrapper:
+    """Возвращает общий экземпляр клиента Википедии."""
+    return WikipediaAPIWrapper()
+
+# Кэш успешных результатов поиска: повторные запросы не обращаются к внешним API
+SEARCH_CACHE_SIZE = 256
+_search_cache: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+
+def normalize_query(query: str) -> str:
+    """Приводит запрос к нижнему регистру и схлопывает пробелы."""
+    return " ".join(query.casefold().split())
+
+def get_cached_search(kind: str, query: str) -> Optional[Any]:
+    """Возвращает сохраненный результат поиска или None."""
+    key = (kind, normalize_query(query))
+    if key not in _search_cache:
+        return None
+    _search_cache.move_to_end(key)
+    return _search_cache[key]
+
+def cache_search(kind: str, query: str, result: Any) -> None:
+    """Сохраняет результат поиска, вытесняя самый давний при переполнении кэша."""
+    _search_cache[(kind, normalize_query(query))] = result
+    if len(_search_cache) > SEARCH_CACHE_SIZE:
+        _search_cache.popitem(last=False)
+
+def store_web_results(query: str, results: Any) -> List[Dict[str, Any]]:
+    """Проверяет ответ Tavily и сохраняет его в кэш."""
+    # При ошибке Tavily возвращает строку вместо списка результатов
+    if not isinstance(results, list):
+        raise RuntimeError(str(results))
+    cache_search("web_search", query, results)
+    return results
+
+def fetch_web_search_sync(query: str) -> List[Dict[str, Any]]:
+    """Синхронный вариант fetch_web_search с тем же кэшем."""
+    cached = get_cached_search("web_search", query)
+    if cached is not None:
+        return cached
+    return store_web_results(query, get_search_tool().invoke(query))
+
+async def fetch_web_search(query: str) -> List[Dict[str, Any]]:
+    """
+    Выполняет поиск Tavily с использованием кэша и возвращает список результатов.
+    При ошибке (в том числе при создании клиента) выбрасывает исключение, ошибки не кэшируются.
+    """
+    cached = get_cached_search("web_search", query)
+    if cached is not None:
+        return cached
+    return store_web_results(query, await get_search_tool().ainvoke(query))
+
+def fetch_wikipedia_sync(query: str) -> str:
+    """
+    Выполняет поиск в Википедии с использованием кэша.
+    При ошибке выбрасывает исключение, ошибки не кэшируются.
+    """
+    cached = get_cached_search("wikipedia", query)
+    if cached is not None:
+        return cached
+    result = get_wikipedia().run(query)
+    cache_search("wikipedia", query, result)
+    return result
+
+async def fetch_wikipedia(query: str) -> str:
+    """Асинхронный вариант fetch_wikipedia_sync."""
+    # У WikipediaAPIWrapper нет асинхронного API, поэтому выносим вызов в поток
+    return await asyncio.to_thread(fetch_wikipedia_sync, query)
+
+# Инструменты для агента: синхронный вариант для invoke, асинхронный для ainvoke
+def run_web_search(query: str) -> str:
     try:
-        results = search_tool.invoke(query)
-        return str(results)
+        return str(fetch_web_search_sync(query))
     except Exception as e:
         return f"Ошибка при поиске: {str(e)}"
 
-@tool
-def search_wikipedia(query: str) -> str:
-    """Поиск информации в Википедии по заданному запросу."""
-    wiki = WikipediaAPIWrapper()
+async def arun_web_search(query: str) -> str:
     try:
-        return wiki.run(query)
+        return str(await fetch_web_search(query))
+    except Exception as e:
+        return f"Ошибка при поиске: {str(e)}"
+
+def run_wikipedia_search(query: str) -> str:
+    try:
+        return fetch_wikipedia_sync(query)
     except Exception as e:
         return f"Ошибка при поиске в Википедии: {str(e)}"
 
-@tool
-def generate_code_snippet(task_description: str) -> str:
-    """Генерирует код на основе описания задачи."""
-    code_prompt = ChatPromptTemplate.from_template(
-        "Напиши код для решения следующей задачи:\n\n{task_description}\n\n"
-        "Предоставь полный код с комментариями и объяснением."
-    )
-    code_chain = code_prompt | model | StrOutputParser()
-    return code_chain.invoke({"task_description": task_description})
+async def arun_wikipedia_search(query: str) -> str:
+    try:
+        return await fetch_wikipedia(query)
+    except Exception as e:
+        return f"Ошибка при поиске в Википедии: {str(e)}"
+
+search_web = StructuredTool.from_function(
+    func=run_web_search,
+    coroutine=arun_web_search,
+    name="search_web",
+    description="Поиск информации в интернете по заданному запросу."
+)
+
+search_wikipedia = StructuredTool.from_function(
+    func=run_wikipedia_search,
+    coroutine=arun_wikipedia_search,
+    name="search_wikipedia",
+    description="Поиск информации в Википедии по заданному запросу."
+)
+
+# Инструменты поиска по типу результата исследования
+SEARCH_TOOLS = {"web_search": search_web, "wikipedia": search_wikipedia}
 
-# Создание парсера для структурированного вывода
-parser = PydanticOutputParser(pydantic_object=DecomposedIdea)
+# Модель возвращает декомпозицию через вызов функции, без JSON-схемы в тексте промпта
+structured_model = model.with_structured_output(DecomposedIdea, method="function_calling", include_raw=True)
 
 # Промпт для декомпозиции идеи
 decomposition_prompt_template = """
@@ -92,7 +206,7 @@ decomposition_prompt_template = """
 которые нужно выполнить для её реализации.
 
 Идея пользователя:
-{idea}
+{{{idea}}}
 
 Проанализируй эту идею и разбей её на логические задачи. Для каждой задачи определи:
 1. Название задачи
@@ -111,73 +225,228 @@ decomposition_prompt_template = """
 - Любые другие задачи, необходимые для реализации идеи
 
 Затем составь общий план реализации идеи, указав последовательность выполнения задач и их взаимосвязи.
-
-{format_instructions}
 """
 
-# Добавление инструкций по форматированию
-format_instructions = parser.get_format_instructions()
-decomposition_prompt = ChatPromptTemplate.from_template(decomposition_prompt_template)
+# Mustache-шаблон допускает фигурные скобки в тексте промпта; тройные скобки отключают HTML-экранирование
+decomposition_prompt = ChatPromptTemplate.from_template(decomposition_prompt_template, template_format="mustache")
+
+# Семантический кэш декомпозиций: перефразированные идеи используют ранее полученный ответ
+IDEA_CACHE_COLLECTION = "idea_cache"
+# Квадрат L2-расстояния между нормализованными векторами (0.15 соответствует косинусной близости ~0.925)
+IDEA_CACHE_MAX_DISTANCE = 0.15
+# Аббревиатуры и токены с цифрами: идеи про "CPC" и "CPM" близки по смыслу, но не взаимозаменяемы
+ENTITY_PATTERN = re.compile(r"\b[A-ZА-ЯЁ]{2,}[\w-]*|\b\w*\d[\w-]*")
+
+@lru_cache(maxsize=None)
+def get_idea_cache() -> Chroma:
+    """Возвращает хранилище семантического кэша."""
+    return Chroma(
+        collection_name=IDEA_CACHE_COLLECTION,
+        embedding_function=get_embeddings(),
+        persist_directory=PERSIST_DIRECTORY
+    )
+
+def extract_entities(text: str) -> str:
+    """Возвращает нормализованный список сущностей идеи для сравнения при попадании в кэш."""
+    entities = {entity.casefold() for entity in ENTITY_PATTERN.findall(text)}
+    return ",".join(sorted(entities))
+
+def lookup_cached_decomposition(idea: str) -> Optional[DecomposedIdea]:
+    """Ищет в кэше декомпозицию семантически близкой идеи с теми же сущностями."""
+    matches = get_idea_cache().similarity_search_with_score(idea, k=1)
+    if not matches:
+        return None
+    
+    document, distance = matches[0]
+    if distance > IDEA_CACHE_MAX_DISTANCE or document.metadata.get("entities") != extract_entities(idea):
+        return None
+    
+    decomposed = DecomposedIdea.model_validate_json(document.metadata["result"])
+    decomposed.original_idea = idea
+    return decomposed
+
+def cache_decomposition(idea: str, decomposed: DecomposedIdea) -> None:
+    """Сохраняет декомпозицию идеи в семантический кэш."""
+    get_idea_cache().add_texts(
+        [idea],
+        metadatas=[{"result": decomposed.model_dump_json(), "entities": extract_entities(idea)}]
+    )
+
+# Минимальная косинусная близость запроса задачи к результату предварительного поиска для его повторного использования
+PREFETCH_MIN_SIMILARITY = 0.75
+
+def prefetched_text(kind: str, item: Any) -> str:
+    """Текст отдельного результата, с которым сравнивается запрос задачи."""
+    # У результата Tavily сравниваем только содержимое страницы, без url и заголовка
+    return item.get("content", "") if kind == "web_search" else item
+
+def format_research(kind: str, items: List[Any]) -> str:
+    """Собирает отобранные результаты в том же виде, в каком их возвращают инструменты поиска."""
+    return str(items) if kind == "web_search" else "\n\n".join(items)
+
+def reuse_prefetched_research(prefetched: Dict[str, List[Any]], task_queries: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Подбирает задачам результаты предварительного поиска по исходной идее.
+    
+    Args:
+        prefetched: Отдельные результаты предварительного поиска по типам ("web_search", "wikipedia")
+        task_queries: Поисковые запросы каждой задачи по тем же типам
+        
+    Returns:
+        Для каждой задачи - только те результаты, близость которых к её запросу выше PREFETCH_MIN_SIMILARITY
+    """
+    reused = [{} for _ in task_queries]
+    items = [(kind, item) for kind, kind_items in prefetched.items() for item in kind_items]
+    pairs = [
+        (i, kind, query)
+        for i, queries in enumerate(task_queries)
+        for kind, query in queries.items()
+        if kind in prefetched
+    ]
+    if not items or not pairs:
+        return reused
+    
+    # Векторы нормализованы, поэтому скалярное произведение равно косинусной близости
+    vectors = get_embeddings().embed_documents(
+        [prefetched_text(kind, item) for kind, item in items] + [query for _, _, query in pairs]
+    )
+    item_vectors = vectors[:len(items)]
+    for (i, kind, _), query_vector in zip(pairs, vectors[len(items):]):
+        selected = [
+            item
+            for (item_kind, item), item_vector in zip(items, item_vectors)
+            if item_kind == kind and sum(a * b for a, b in zip(query_vector, item_vector)) > PREFETCH_MIN_SIMILARITY
+        ]
+        if selected:
+            reused[i][kind] = format_research(kind, selected)
+    
+    return reused
 
 # Функции для графа состояний
-def decompose_idea_step(state: AgentState) -> AgentState:
+async def decompose_idea_step(state: AgentState) -> AgentState:
     """Шаг декомпозиции идеи"""
     idea = state["idea"]
     
+    # Проверка семантического кэша (эмбеддинги и Chroma работают синхронно).
+    # Кэш необязателен: любая ошибка Chroma или модели эмбеддингов считается промахом
+    try:
+        cached = await asyncio.to_thread(lookup_cached_decomposition, idea)
+    except Exception as e:
+        print(f"Семантический кэш недоступен: {e}")
+        cached = None
+    if cached is not None:
+        return {"decomposed_idea": cached}
+    
     # Формирование промпта
-    prompt_input = {"idea": idea, "format_instructions": format_instructions}
+    prompt_input = {"idea": idea}
     prompt_result = decomposition_prompt.invoke(prompt_input)
     
-    # Получение ответа от модели
-    model_result = model.invoke(prompt_result)
-    result_text = model_result.content
+    # Получение структурированного ответа от модели
+    model_result = await structured_model.ainvoke(prompt_result)
+    decomposed = model_result["parsed"]
+    
+    if decomposed is None:
+        raw = model_result["raw"]
+        raw_text = raw.content or str(raw.tool_calls or raw.invalid_tool_calls)
+        # parsing_error пуст, если модель ответила текстом, не вызвав функцию
+        error = model_result["parsing_error"] or f"модель не вызвала функцию, ответ: {raw_text}"
+        print(f"Ошибка при парсинге: {error}")
+        # Возвращаем сырой ответ, если парсинг не удался
+        return {"decomposed_idea": DecomposedIdea(
+            original_idea=idea, summary="Ошибка парсинга", tasks=[],
+            implementation_plan=raw_text
+        )}
     
-    # Парсинг результата
+    # Ошибка записи в кэш не должна терять уже полученную декомпозицию
     try:
-        decomposed = parser.parse(result_text)
-        return {"decomposed_idea": decomposed}
+        await asyncio.to_thread(cache_decomposition, idea, decomposed)
     except Exception as e:
-        print(f"Ошибка при парсинге: {e}")
-        # Возвращаем сырой текст, если парсинг не удался
-        return {"decomposed_idea": {"original_idea": idea, "summary": "Ошибка парсинга", 
-                                   "tasks": [], "implementation_plan": result_text}}
+        print(f"Не удалось сохранить декомпозицию в семантический кэш: {e}")
+    return {"decomposed_idea": decomposed}
+
+async def prefetch_research(state: AgentState) -> AgentState:
+    """Шаг предварительного поиска по исходной идее, выполняется параллельно с декомпозицией"""
+    idea = state["idea"]
+    # Клиенты создаются внутри корутин, поэтому ошибки их создания (например, без TAVILY_API_KEY)
+    # тоже перехватываются gather и не прерывают обработку идеи
+    web_results, wiki_results = await asyncio.gather(
+        fetch_web_search(idea),
+        fetch_wikipedia(idea),
+        return_exceptions=True
+    )
+    
+    # Сохраняем только успешные результаты, разбитые на отдельные страницы для оценки по задачам
+    prefetched = {}
+    if isinstance(web_results, list):
+        prefetched["web_search"] = web_results
+    if isinstance(wiki_results, str):
+        # WikipediaAPIWrapper разделяет сводки страниц пустой строкой
+        prefetched["wikipedia"] = wiki_results.split("\n\n")
+    
+    return {"prefetched_research": prefetched}
 
-def research_tasks(state: AgentState) -> AgentState:
+async def research_tasks(state: AgentState) -> AgentState:
     """Шаг исследования задач"""
     decomposed_idea = state.get("decomposed_idea")
     if not decomposed_idea:
         return {"research_results": {}}
     
-    research_results = {}
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
     
-    for task in decomposed_idea.tasks:
-        if "сбор данных" in task.category.lower() or "поиск" in task.category.lower():
-            # Выполняем поиск для задач, связанных со сбором данных
-            search_query = f"{decomposed_idea.summary} {task.name}"
-            web_results = search_web(search_query)
-            wiki_results = search_wikipedia(task.name)
-            
-            research_results[task.name] = {
-                "web_search": web_results,
-                "wikipedia": wiki_results
-            }
+    async def run_search(kind: str, query: str) -> str:
+        async with semaphore:
+            return await SEARCH_TOOLS[kind].ainvoke(query)
+    
+    # Выполняем поиск для задач, связанных со сбором данных
+    tasks = [task for task in decomposed_idea.tasks if RESEARCH_CATEGORY_PATTERN.search(task.category)]
+    task_queries = [
+        {"web_search": f"{decomposed_idea.summary} {task.name}", "wikipedia": task.name}
+        for task in tasks
+    ]
+    
+    # Релевантные результаты предварительного поиска заменяют новые запросы.
+    # Оценка необязательна: при ошибке модели эмбеддингов все запросы выполняются заново
+    try:
+        reused = await asyncio.to_thread(
+            reuse_prefetched_research, state.get("prefetched_research") or {}, task_queries
+        )
+    except Exception as e:
+        print(f"Не удалось использовать результаты предварительного поиска: {e}")
+        reused = [{} for _ in task_queries]
+    
+    # Недостающие результаты ищутся одновременно, одинаковые запросы разных задач - один раз
+    pending = {}
+    for queries, cached in zip(task_queries, reused):
+        for kind, query in queries.items():
+            if kind not in cached:
+                pending.setdefault((kind, normalize_query(query)), query)
+    results = await asyncio.gather(*(run_search(kind, query) for (kind, _), query in pending.items()))
+    found = dict(zip(pending, results))
+    
+    research_results = {}
+    for task, queries, cached in zip(tasks, task_queries, reused):
+        research_results[task.name] = {
+            kind: cached[kind] if kind in cached else found[(kind, normalize_query(query))]
+            for kind, query in queries.items()
+        }
     
     return {"research_results": research_results}
 
-def generate_code_for_tasks(state: AgentState) -> AgentState:
+async def generate_code_for_tasks(state: AgentState) -> AgentState:
     """Шаг генерации кода для задач"""
     decomposed_idea = state.get("decomposed_idea")
     if not decomposed_idea:
         return {"code_snippets": {}}
     
-    code_snippets = {}
+    tasks = [task for task in decomposed_idea.tasks if CODE_CATEGORY_PATTERN.search(task.category)]
+    inputs = [
+        {"task_description": f"{decomposed_idea.summary} - {task.description}"}
+        for task in tasks
+    ]
+    # Все задачи отправляются одним батчем с ограничением числа одновременных запросов
+    results = await code_chain.abatch(inputs, config={"max_concurrency": MAX_CONCURRENCY})
     
-    for task in decomposed_idea.tasks:
-        if "разработка" in task.category.lower() or "код" in task.category.lower():
-            code = generate_code_snippet(f"{decomposed_idea.summary} - {task.description}")
-            code_snippets[task.name] = code
-    
-    return {"code_snippets": code_snippets}
+    return {"code_snippets": {task.name: code for task, code in zip(tasks, results)}}
 
 def create_final_report(state: AgentState) -> AgentState:
     """Создание финального отчета"""
@@ -188,7 +457,7 @@ def create_final_report(state: AgentState) -> AgentState:
     if not decomposed_idea:
         return {"final_report": "Не удалось декомпозировать идею."}
     
-    report = f"""
+    parts = [f"""
 # Отчет по идее: {decomposed_idea.summary}
 
 ## Исходная идея
@@ -198,36 +467,39 @@ def create_final_report(state: AgentState) -> AgentState:
 {decomposed_idea.summary}
 
 ## Задачи
-"""
+"""]
     
     for i, task in enumerate(decomposed_idea.tasks, 1):
-        report += f"""
+        parts.append(f"""
 ### {i}. {task.name} (Сложность: {task.estimated_complexity}, Категория: {task.category})
 **Описание:** {task.description}
 **Необходимые инструменты:** {', '.join(task.tools_needed)}
-"""
+""")
         
         # Добавление результатов исследования, если есть
         if task.name in research_results:
-            report += f"""
+            parts.append(f"""
 **Результаты исследования:**
 - Веб-поиск: {research_results[task.name].get('web_search', 'Нет данных')}
 - Википедия: {research_results[task.name].get('wikipedia', 'Нет данных')}
-"""
+""")
         
         # Добавление сгенерированного кода, если есть
         if task.name in code_snippets:
-            report += f"""
+            parts.append(f"""
 **Сгенерированный код:**
 ```python
 {code_snippets[task.name]}
 ```
-"""
+""")
     
-    report += f"""
+    parts.append(f"""
 ## План реализации
 {decomposed_idea.implementation_plan}
-"""
+""")
+    
+    # Части собираются одной операцией, без повторного копирования строки в цикле
+    report = "".join(parts)
     
     return {"final_report": report}
 
@@ -236,39 +508,69 @@ workflow = StateGraph(AgentState)
 
 # Добавление узлов
 workflow.add_node("decompose_idea", decompose_idea_step)
+workflow.add_node("prefetch_research", prefetch_research)
 workflow.add_node("research_tasks", research_tasks)
 workflow.add_node("generate_code", generate_code_for_tasks)
 workflow.add_node("create_report", create_final_report)
 
 # Определение потока
+# Предварительный поиск идет параллельно с декомпозицией, исследование ждет оба шага
 workflow.add_edge(START, "decompose_idea")
-workflow.add_edge("decompose_idea", "research_tasks")
+workflow.add_edge(START, "prefetch_research")
+workflow.add_edge(["decompose_idea", "prefetch_research"], "research_tasks")
 workflow.add_edge("research_tasks", "generate_code")
 workflow.add_edge("generate_code", "create_report")
 
 # Компиляция графа
 agent_executor = workflow.compile()
 
-def process_idea(idea: str) -> Dict[str, Any]:
+async def aprocess_idea(idea: str, stream: bool = False) -> Dict[str, Any]:
     """
-    Обрабатывает идею с использованием агента.
+    Асинхронно обрабатывает идею с использованием агента.
     
     Args:
         idea: Строка с описанием идеи
+        stream: Выводить ли ответ модели на шаге декомпозиции по мере генерации
         
     Returns:
         Словарь с результатами обработки
     """
     try:
         # Запуск графа состояний
-        result = agent_executor.invoke({"idea": idea})
+        if not stream:
+            return await agent_executor.ainvoke({"idea": idea})
+        
+        # Токены декомпозиции печатаются сразу, итоговое состояние берется из последнего снимка
+        result = {}
+        async for mode, chunk in agent_executor.astream({"idea": idea}, stream_mode=["messages", "values"]):
+            if mode == "messages":
+                message, metadata = chunk
+                if metadata.get("langgraph_node") == "decompose_idea":
+                    # Структурированный ответ приходит в аргументах вызова функции
+                    tool_args = "".join(call.get("args") or "" for call in getattr(message, "tool_call_chunks", []))
+                    print(message.content or tool_args, end="", flush=True)
+            else:
+                result = chunk
+        print()
         return result
     except Exception as e:
         return {"error": str(e)}
 
-def interactive_mode():
+def process_idea(idea: str) -> Dict[str, Any]:
     """
-    Интерактивный режим для обработки идей.
+    Обрабатывает идею с использованием агента.
+    
+    Args:
+        idea: Строка с описанием идеи
+        
+    Returns:
+        Словарь с результатами обработки
+    """
+    return asyncio.run(aprocess_idea(idea))
+
+async def ainteractive_mode():
+    """
+    Асинхронный интерактивный режим для обработки идей.
     """
     print("=" * 50)
     print("Продвинутый агент декомпозиции идей")
@@ -279,7 +581,7 @@ def interactive_mode():
     print("-" * 50)
     
     while True:
-        idea = input("\nВаша идея: ")
+        idea = await asyncio.to_thread(input, "\nВаша идея: ")
         
         if idea.lower() in ['exit', 'quit']:
             print("До свидания!")
@@ -291,7 +593,7 @@ def interactive_mode():
             
         print("\nАнализирую вашу идею...\n")
         
-        result = process_idea(idea)
+        result = await aprocess_idea(idea, stream=True)
         
         if "error" in result:
             print(f"Произошла ошибка: {result['error']}")
@@ -305,5 +607,11 @@ def interactive_mode():
         
         print("\n" + "-" * 50)
 
+def interactive_mode():
+    """
+    Интерактивный режим для обработки идей.
+    """
+    asyncio.run(ainteractive_mode())
+
 if __name__ == "__main__":
     interactive_mode()
@@ -0,0 +1,65 @@
+"""
+Embedding model settings shared by the MCP server scripts and the idea agent.
+Uses sentence-transformers/all-MiniLM-L6-v2 with the fastest available backend.
+"""
+
+import importlib.util
+import os
+import platform
+from functools import lru_cache
+from typing import Dict, Any
+
+import torch
+from langchain_community.embeddings import HuggingFaceEmbeddings
+
+# Constants
+PERSIST_DIRECTORY = "./chroma_db"
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = 256
+# ONNX exports published alongside the model on the Hugging Face Hub
+ONNX_FP32_FILE = "onnx/model.onnx"
+ONNX_INT8_FILES = {
+    "arm64": "onnx/model_qint8_arm64.onnx",
+    "avx512_vnni": "onnx/model_qint8_avx512_vnni.onnx",
+    "avx2": "onnx/model_quint8_avx2.onnx",
+}
+# Set to "1" to opt in to int8 ONNX inference. Query-side embeddings (e.g. in
+# search_chroma.py) stay fp32, so quantized document vectors drift slightly from them.
+ONNX_INT8_ENV = "EMBEDDING_ONNX_INT8"
+
+def select_onnx_file() -> str:
+    """Pick the ONNX export for this CPU: fp32 by default, int8 only when opted in."""
+    if os.getenv(ONNX_INT8_ENV) != "1":
+        return ONNX_FP32_FILE
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return ONNX_INT8_FILES["arm64"]
+    try:
+        with open("/proc/cpuinfo") as f:
+            has_vnni = "avx512_vnni" in f.read()
+    except OSError:
+        has_vnni = False
+    return ONNX_INT8_FILES["avx512_vnni" if has_vnni else "avx2"]
+
+def select_model_kwargs() -> Dict[str, Any]:
+    """Pick the fastest available device and precision for the embedding model.
+
+    CUDA or Apple MPS run the model in fp16. CPU-only machines use the ONNX
+    backend when optimum/onnxruntime are installed (see select_onnx_file),
+    and fp32 PyTorch otherwise.
+    """
+    if torch.cuda.is_available():
+        return {"device": "cuda", "model_kwargs": {"torch_dtype": torch.float16}}
+    if torch.backends.mps.is_available():
+        return {"device": "mps", "model_kwargs": {"torch_dtype": torch.float16}}
+    if importlib.util.find_spec("optimum") and importlib.util.find_spec("onnxruntime"):
+        return {"device": "cpu", "backend": "onnx", "model_kwargs": {"file_name": select_onnx_file()}}
+    return {"device": "cpu"}
+
+@lru_cache(maxsize=None)
+def get_embeddings() -> HuggingFaceEmbeddings:
+    """Return the shared LangChain embedding model."""
+    return HuggingFaceEmbeddings(
+        model_name=MODEL_NAME,
+        model_kwargs=select_model_kwargs(),
+        encode_kwargs={"batch_size": EMBEDDING_BATCH_SIZE, "normalize_embeddings": True}
+    )
@@ -4,13 +4,17 @@ Explore Chroma database of MCP servers.
 """
 
 import chromadb
-import json
+import orjson
 import sys
 
 # Constants
 PERSIST_DIRECTORY = "./chroma_db"
 COLLECTION_NAME = "mcp_servers"
 
+def format_json(obj):
+    """Pretty-print an object as indented JSON."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
 def list_collections(client):
     """List all collections in the database."""
     collections = client.list_collections()
@@ -24,19 +28,19 @@ def explore_collection(collection):
     count = collection.count()
     print(f"\nCollection '{collection.name}' contains {count} documents.")
     
-    # Get collection info
+    # Get collection info (collection metadata only, not every stored record)
     print("\nCollection info:")
-    print(json.dumps(collection.get(), indent=2))
+    print(format_json(collection.metadata))
     
-    # Show a few sample documents
+    # Show a few sample documents without loading their embeddings
     limit = min(5, count)
     print(f"\nShowing {limit} sample documents:")
-    results = collection.get(limit=limit)
+    results = collection.get(limit=limit, include=["documents", "metadatas"])
     
     for i in range(limit):
         print(f"\n--- Document {i+1} ---")
         print(f"ID: {results['ids'][i]}")
-        print(f"Metadata: {json.dumps(results['metadatas'][i], indent=2)}")
+        print(f"Metadata: {format_json(results['metadatas'][i])}")
         print(f"Document: {results['documents'][i][:200]}...")  # Show first 200 chars
 
 def search_collection(collection, query_text, n_results=5):
@@ -55,7 +59,7 @@ def search_collection(collection, query_text, n_results=5):
     )):
         print(f"\n--- Result {i+1} ---")
         print(f"ID: {doc_id}")
-        print(f"Metadata: {json.dumps(metadata, indent=2)}")
+        print(f"Metadata: {format_json(metadata)}")
         print(f"Document: {doc[:200]}...")  # Show first 200 chars
         print(f"Distance: {results['distances'][0][i]}")
 
@@ -2,11 +2,13 @@ import os
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 from langchain_deepseek import ChatDeepSeek
 from langchain_core.runnables import RunnablePassthrough
-from langchain.output_parsers import PydanticOutputParser
 from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.callbacks import StreamingStdOutCallbackHandler
+from langchain_core.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
 from dotenv import load_dotenv
 
 # Загрузка переменных окружения
@@ -16,6 +18,10 @@ load_dotenv()
 if not os.getenv("DEEPSEEK_API_KEY"):
     raise ValueError("DEEPSEEK_API_KEY не найден в переменных окружения. Пожалуйста, добавьте его в .env файл.")
 
+# Кэширование ответов LLM: повторные запросы с тем же промптом не обращаются к API
+LLM_CACHE_PATH = ".llm_cache.db"
+set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
 # Модель для представления задачи
 class Task(BaseModel):
     name: str = Field(description="Название задачи")
@@ -31,10 +37,13 @@ class DecomposedIdea(BaseModel):
     implementation_plan: str = Field(description="План реализации идеи")
 
 # Инициализация модели DeepSeek
+# streaming=True: ответ генерируется потоком и передается обработчикам токенов,
+# при этом invoke по-прежнему сначала проверяет кэш LLM
 model = ChatDeepSeek(
     model="deepseek-chat",
     temperature=0.2,
-    max_tokens=4000
+    max_tokens=4000,
+    streaming=True
 )
 
 # Создание парсера для структурированного вывода
@@ -46,7 +55,7 @@ decomposition_prompt_template = """
 которые нужно выполнить для её реализации.
 
 Идея пользователя:
-{idea}
+{{{idea}}}
 
 Проанализируй эту идею и разбей её на логические задачи. Для каждой задачи определи:
 1. Название задачи
@@ -56,39 +65,48 @@ decomposition_prompt_template = """
 
 Затем составь общий план реализации идеи, указав последовательность выполнения задач и их взаимосвязи.
 
-{format_instructions}
+{{{format_instructions}}}
 """
 
 # Добавление инструкций по форматированию
 format_instructions = parser.get_format_instructions()
-decomposition_prompt = ChatPromptTemplate.from_template(decomposition_prompt_template)
+# Mustache-шаблон допускает фигурные скобки в тексте промпта; тройные скобки отключают HTML-экранирование.
+# Инструкции по форматированию не меняются, поэтому задаются один раз при создании промпта
+decomposition_prompt = ChatPromptTemplate.from_template(
+    decomposition_prompt_template, template_format="mustache"
+).partial(format_instructions=format_instructions)
 
 # Создание цепочки для декомпозиции идеи
 decomposition_chain = (
-    {"idea": RunnablePassthrough(), "format_instructions": lambda _: format_instructions}
+    {"idea": RunnablePassthrough()}
     | decomposition_prompt
     | model
     | StrOutputParser()
 )
 
-def decompose_idea(idea: str) -> Dict[str, Any]:
+def decompose_idea(idea: str, stream: bool = False) -> Dict[str, Any]:
     """
     Декомпозирует идею на конкретные задачи.
     
     Args:
         idea: Строка с описанием идеи
+        stream: Выводить ли ответ модели по мере генерации
         
     Returns:
         Словарь с декомпозированной идеей
     """
     try:
-        # Получение структурированного ответа от модели
-        result = decomposition_chain.invoke(idea)
+        # Получение структурированного ответа от модели.
+        # При stream=True токены печатаются по мере генерации; вызов через invoke сохраняет работу кэша LLM
+        config = {"callbacks": [StreamingStdOutCallbackHandler()]} if stream else None
+        result = decomposition_chain.invoke(idea, config=config)
+        if stream:
+            print()
         
         # Попытка распарсить ответ в структуру DecomposedIdea
         try:
             parsed_result = parser.parse(result)
-            return parsed_result.dict()
+            return parsed_result.model_dump(mode="json")
         except Exception as e:
             # Если не удалось распарсить, возвращаем текстовый ответ
             print(f"Ошибка при парсинге ответа: {e}")
@@ -121,7 +139,7 @@ def interactive_decomposition():
             
         print("\nАнализирую вашу идею...\n")
         
-        result = decompose_idea(idea)
+        result = decompose_idea(idea, stream=True)
         
         if "error" in result:
             print(f"Произошла ошибка: {result['error']}")
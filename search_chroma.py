@@ -7,10 +7,33 @@ Usage: python search_chroma.py "your search query" [number_of_results]
 import chromadb
 import json
 import sys
+from functools import lru_cache
+from chromadb.utils import embedding_functions
+from diskcache import Cache
 
 # Constants
 PERSIST_DIRECTORY = "./chroma_db"
 COLLECTION_NAME = "mcp_servers"
+# Model behind Chroma's default embedding function; part of the cache key
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+QUERY_CACHE_DIRECTORY = ".query_vec_cache"
+
+client = chromadb.PersistentClient(path=PERSIST_DIRECTORY)
+
+@lru_cache(maxsize=None)
+def get_embedding_function():
+    """Return Chroma's default embedding function; it is only loaded on a cache miss."""
+    return embedding_functions.DefaultEmbeddingFunction()
+
+def get_query_embedding(query_text):
+    """Return the embedding for a query, computing it only on a cache miss."""
+    key = (MODEL_NAME, query_text)
+    with Cache(QUERY_CACHE_DIRECTORY) as cache:
+        embedding = cache.get(key)
+        if embedding is None:
+            embedding = [float(value) for value in get_embedding_function()([query_text])[0]]
+            cache.set(key, embedding)
+    return embedding
 
 def search_collection(query_text, n_results=5):
     """Search the collection for documents matching the query."""
@@ -19,16 +42,13 @@ def search_collection(query_text, n_results=5):
     full_path = os.path.abspath(PERSIST_DIRECTORY)
     print(f"Using Chroma database at: {full_path}")
     
-    # Connect to the Chroma client
-    client = chromadb.PersistentClient(path=PERSIST_DIRECTORY)
-    
     # Get the collection
     collection = client.get_collection(COLLECTION_NAME)
     
     # Search
     print(f"Searching for: '{query_text}'")
     results = collection.query(
-        query_texts=[query_text],
+        query_embeddings=[get_query_embedding(query_text)],
         n_results=n_results
     )
     
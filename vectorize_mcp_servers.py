@@ -1,27 +1,40 @@
 #!/usr/bin/env python3
 """
-Vectorize MCP servers from JSON into Chroma using LangChain.
+Vectorize MCP servers from JSON into Chroma.
 Uses sentence-transformers/all-MiniLM-L6-v2 for embeddings and retrieval.
 """
 
-import json
-import os
+from functools import lru_cache
 from typing import Dict, List, Any
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+import chromadb
+import orjson
+from chromadb.api.models.Collection import Collection
 from langchain_core.documents import Document
+from sentence_transformers import SentenceTransformer
+
+from embedding_model import (
+    EMBEDDING_BATCH_SIZE,
+    MODEL_NAME,
+    PERSIST_DIRECTORY,
+    select_model_kwargs,
+)
 
 # Constants
 MCP_SERVERS_FILE = "mcp-servers.json"
-PERSIST_DIRECTORY = "./chroma_db"
 COLLECTION_NAME = "mcp_servers"
-MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Stay below Chroma's maximum number of records per write
+CHROMA_BATCH_SIZE = 5000
+
+@lru_cache(maxsize=None)
+def get_encoder() -> SentenceTransformer:
+    """Return the shared SentenceTransformer used for ingestion."""
+    return SentenceTransformer(MODEL_NAME, **select_model_kwargs())
 
 def load_mcp_servers(file_path: str) -> List[Dict[str, Any]]:
     """Load MCP servers from JSON file."""
-    with open(file_path, "r") as f:
-        data = json.load(f)
+    with open(file_path, "rb") as f:
+        data = orjson.loads(f.read())
     return data["servers"]
 
 def create_documents_from_servers(servers: List[Dict[str, Any]]) -> List[Document]:
@@ -56,39 +69,56 @@ def create_documents_from_servers(servers: List[Dict[str, Any]]) -> List[Documen
     
     return documents
 
-def vectorize_documents(documents: List[Document]) -> Chroma:
-    """Vectorize documents and store in Chroma."""
-    # Initialize the embedding model
-    embeddings = HuggingFaceEmbeddings(
-        model_name=MODEL_NAME,
-        model_kwargs={"device": "cpu"},
-        encode_kwargs={"normalize_embeddings": True}
-    )
+def vectorize_documents(documents: List[Document]) -> Collection:
+    """Vectorize documents and store them in Chroma."""
+    # Embed all documents in one call so the model runs on full batches
+    texts = [doc.page_content for doc in documents]
+    embeddings = get_encoder().encode(
+        texts,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=True
+    ).tolist()
     
-    # Create or load the vector store
-    vector_store = Chroma.from_documents(
-        documents=documents,
-        embedding=embeddings,
-        persist_directory=PERSIST_DIRECTORY,
-        collection_name=COLLECTION_NAME
-    )
+    # Rebuild the collection from scratch: older versions stored servers under random
+    # UUIDs, and servers removed from the JSON file should not linger either
+    client = chromadb.PersistentClient(path=PERSIST_DIRECTORY)
+    # list_collections() returns names in newer chromadb and Collection objects in older ones
+    existing = {getattr(c, "name", c) for c in client.list_collections()}
+    if COLLECTION_NAME in existing:
+        client.delete_collection(COLLECTION_NAME)
+    collection = client.create_collection(COLLECTION_NAME)
     
-    # Persist the vector store
-    vector_store.persist()
+    # Write the precomputed embeddings straight into the collection
+    ids = [str(doc.metadata["id"]) for doc in documents]
+    metadatas = [doc.metadata for doc in documents]
+    for start in range(0, len(documents), CHROMA_BATCH_SIZE):
+        end = start + CHROMA_BATCH_SIZE
+        collection.add(
+            ids=ids[start:end],
+            embeddings=embeddings[start:end],
+            metadatas=metadatas[start:end],
+            documents=texts[start:end]
+        )
     
-    return vector_store
+    return collection
 
-def query_vector_store(vector_store: Chroma, query: str, k: int = 5) -> List[Document]:
+def query_vector_store(collection: Collection, query: str, k: int = 5) -> List[Document]:
     """Query the vector store for similar documents."""
-    # Create a retriever from the vector store
-    retriever = vector_store.as_retriever(
-        search_kwargs={"k": k}
-    )
+    # Embed the query with the same model used for the documents
+    query_embedding = get_encoder().encode(query, normalize_embeddings=True, convert_to_numpy=True).tolist()
     
     # Retrieve similar documents
-    docs = retriever.get_relevant_documents(query)
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=k
+    )
     
-    return docs
+    return [
+        Document(page_content=text, metadata=metadata)
+        for text, metadata in zip(results["documents"][0], results["metadatas"][0])
+    ]
 
 def main():
     """Main function to vectorize MCP servers and demonstrate retrieval."""
@@ -100,7 +130,7 @@ def main():
     documents = create_documents_from_servers(servers)
     
     print(f"Vectorizing documents using {MODEL_NAME}...")
-    vector_store = vectorize_documents(documents)
+    collection = vectorize_documents(documents)
     print(f"Vectorization complete. Data stored in {PERSIST_DIRECTORY}")
     
     # Example queries to demonstrate retrieval
@@ -115,7 +145,7 @@ def main():
     print("\nDemonstrating retrieval with example queries:")
     for query in example_queries:
         print(f"\nQuery: '{query}'")
-        results = query_vector_store(vector_store, query, k=3)
+        results = query_vector_store(collection, query, k=3)
         
         print(f"Top {len(results)} results:")
         for i, doc in enumerate(results):